@@ -1,23 +1,17 @@
 #!/usr/bin/env python3
-"""Add is_admin column to existing players table."""
+"""Add is_admin column to existing players table.
 
-from auth import get_db_connection
+The migration lives in auth.ensure_tables(); this script just runs it.
+"""
+
+from auth import ensure_tables
 
 def add_admin_column():
-    conn = get_db_connection()
     try:
-        cur = conn.cursor()
-        cur.execute("ALTER TABLE players ADD COLUMN is_admin BOOLEAN DEFAULT FALSE")
-        conn.commit()
-        print("Successfully added is_admin column")
+        ensure_tables()
+        print("Ensured is_admin column exists")
     except Exception as e:
-        if "Duplicate column name" in str(e):
-            print("Column already exists")
-        else:
-            print(f"Error: {e}")
-    finally:
-        cur.close()
-        conn.close()
+        print(f"Error: {e}")
 
 if __name__ == "__main__":
     add_admin_column()
\ No newline at end of file
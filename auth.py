@@ -1,7 +1,14 @@
 import os
+import time
+import queue
+import threading
+import base64
+import hashlib
 import bcrypt
+from concurrent.futures import ThreadPoolExecutor
 import mysql.connector
-from mysql.connector import errorcode
+from mysql.connector import HAVE_CEXT, errorcode, pooling
+from collections import OrderedDict, deque
 from datetime import datetime
 
 # Configuration: should be overridden in production by environment variables
@@ -11,12 +18,39 @@ DB_CONFIG = {
     'host': os.getenv('DB_HOST', '127.0.0.1'),
     'database': os.getenv('DB_NAME', 'anteater_game'),
     'raise_on_warnings': True,
+    'autocommit': False,
+    # prefer the C extension driver when it is installed
+    'use_pure': not HAVE_CEXT,
 }
 
+# Connection pools keyed by autocommit mode, created lazily on first use so
+# importing this module doesn't require a reachable database. A pool opens
+# all of its connections up front, so the read-only autocommit pool, which
+# only serves short lookups, is kept small.
+_POOLS = {}
+_POOL_SIZES = {False: 16, True: 4}
+# the main thread, the game's DB worker and the score writer all check out
+# connections; the lock keeps them from building the same pool twice
+_POOLS_LOCK = threading.Lock()
 
-def get_db_connection():
-    """Return a new MySQL connection using DB_CONFIG."""
-    return mysql.connector.connect(**DB_CONFIG)
+
+def get_db_connection(autocommit: bool = False):
+    """Return a pooled MySQL connection using DB_CONFIG.
+
+    Read-only callers pass autocommit=True to skip the implicit transaction.
+    Calling close() on the returned connection hands it back to the pool
+    instead of tearing down the socket.
+    """
+    pool = _POOLS.get(autocommit)
+    if pool is None:
+        with _POOLS_LOCK:
+            pool = _POOLS.get(autocommit)
+            if pool is None:
+                config = dict(DB_CONFIG, autocommit=autocommit)
+                name = 'anteater_autocommit' if autocommit else 'anteater'
+                pool = _POOLS[autocommit] = pooling.MySQLConnectionPool(
+                    pool_name=name, pool_size=_POOL_SIZES[autocommit], **config)
+    return pool.get_connection()
 
 
 def ensure_tables():
@@ -28,7 +62,9 @@ def ensure_tables():
             username VARCHAR(64) NOT NULL UNIQUE,
             password_hash VARBINARY(128) NOT NULL,
             date_created DATETIME NOT NULL,
-            is_admin BOOLEAN DEFAULT FALSE
+            is_admin BOOLEAN DEFAULT FALSE,
+            INDEX idx_players_login (username, password_hash, player_id, is_admin),
+            INDEX idx_players_admin (player_id, is_admin)
         ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
         """,
         """
@@ -38,6 +74,8 @@ def ensure_tables():
             score INT NOT NULL,
             date DATETIME NOT NULL,
             level INT NOT NULL DEFAULT 1,
+            INDEX idx_scores_score_desc (score DESC),
+            INDEX idx_scores_player (player_id),
             FOREIGN KEY (player_id) REFERENCES players(player_id) ON DELETE CASCADE
         ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
         """,
@@ -55,30 +93,113 @@ def ensure_tables():
     conn = get_db_connection()
     try:
         cur = conn.cursor()
-        for s in ddl:
-            cur.execute(s)
-        # migration: ensure 'level' column exists on scores (add if missing)
-        try:
-            cur.execute("ALTER TABLE scores ADD COLUMN level INT NOT NULL DEFAULT 1")
-            conn.commit()
-        except Exception:
-            # ignore if column exists or any other issue; it's a best-effort migration
-            conn.rollback()
-        
-        # migration: ensure 'is_admin' column exists on players (add if missing)
-        try:
-            cur.execute("ALTER TABLE players ADD COLUMN is_admin BOOLEAN DEFAULT FALSE")
-            conn.commit()
-        except Exception:
-            # ignore if column exists or any other issue; it's a best-effort migration
-            conn.rollback()
+        _execute_batch(cur, ddl)
+        # migration: add any columns that older databases are missing. Look
+        # them up in one query instead of attempting an ALTER per column.
+        cur.execute(
+            "SELECT TABLE_NAME, COLUMN_NAME FROM information_schema.COLUMNS "
+            "WHERE TABLE_SCHEMA = DATABASE()"
+        )
+        existing = {(t, c) for t, c in cur.fetchall()}
+        alters = [
+            f"ALTER TABLE {table} ADD COLUMN {column} {definition}"
+            for table, column, definition in _COLUMN_MIGRATIONS
+            if (table, column) not in existing
+        ]
+        cur.execute(
+            "SELECT DISTINCT TABLE_NAME, INDEX_NAME FROM information_schema.STATISTICS "
+            "WHERE TABLE_SCHEMA = DATABASE()"
+        )
+        existing = {(t, i) for t, i in cur.fetchall()}
+        alters += [
+            f"ALTER TABLE {table} ADD INDEX {index} {columns}"
+            for table, index, columns in _INDEX_MIGRATIONS
+            if (table, index) not in existing
+        ]
+        if alters:
+            try:
+                _execute_batch(cur, alters)
+            except mysql.connector.Error as e:
+                # another process migrated between our lookup and the ALTER
+                if e.errno not in (errorcode.ER_DUP_FIELDNAME, errorcode.ER_DUP_KEYNAME):
+                    raise
         conn.commit()
     finally:
         cur.close()
         conn.close()
 
 
+# columns added after the first release: (table, column, definition)
+_COLUMN_MIGRATIONS = [
+    ('scores', 'level', 'INT NOT NULL DEFAULT 1'),
+    ('players', 'is_admin', 'BOOLEAN DEFAULT FALSE'),
+]
+
+# indexes added after the first release: (table, index, columns)
+_INDEX_MIGRATIONS = [
+    ('players', 'idx_players_login', '(username, password_hash, player_id, is_admin)'),
+    ('players', 'idx_players_admin', '(player_id, is_admin)'),
+    ('scores', 'idx_scores_score_desc', '(score DESC)'),
+]
+
+
+# Connector/Python 9.2 dropped execute(multi=True): a plain execute() takes a
+# multi-statement string and nextset() steps through the results instead.
+_LEGACY_MULTI = mysql.connector.__version_info__[:2] < (9, 2)
+
+
+def _execute_batch(cur, statements):
+    """Send several statements to the server in a single round-trip."""
+    sql = ';'.join(s.strip().rstrip(';') for s in statements)
+    if _LEGACY_MULTI:
+        for _ in cur.execute(sql, multi=True):
+            pass
+        return
+    cur.execute(sql)
+    while cur.nextset():
+        pass
+
+
 # ---- Auth functions ----
+# bcrypt cost factor for new hashes. The cost is stored in each hash, so
+# existing rows hashed at a different cost still verify.
+BCRYPT_ROUNDS = int(os.getenv('BCRYPT_ROUNDS', '10'))
+
+# Bounded worker pool for bcrypt so bursts of signups/logins use every core
+# but never run more KDFs at once than there are workers.
+_BCRYPT_POOL = None
+
+
+def _bcrypt_pool():
+    global _BCRYPT_POOL
+    if _BCRYPT_POOL is None:
+        _BCRYPT_POOL = ThreadPoolExecutor(max_workers=min(4, os.cpu_count() or 1))
+    return _BCRYPT_POOL
+
+
+# bcrypt salts are 16 random bytes in bcrypt's own base64 alphabet. Draw
+# entropy for a batch of salts per os.urandom() call instead of one per hash.
+_SALT_BATCH = 256
+_SALT_BYTES = 16
+_BCRYPT_B64 = bytes.maketrans(
+    b'ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/',
+    b'./ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789',
+)
+_SALTS = deque()
+
+
+def _gensalt(rounds: int) -> bytes:
+    """Equivalent of bcrypt.gensalt(rounds) backed by a pre-drawn salt pool."""
+    try:
+        raw = _SALTS.popleft()
+    except IndexError:
+        blob = os.urandom(_SALT_BYTES * _SALT_BATCH)
+        _SALTS.extend(blob[i:i + _SALT_BYTES] for i in range(0, len(blob), _SALT_BYTES))
+        raw = _SALTS.popleft()
+    encoded = base64.b64encode(raw)[:22].translate(_BCRYPT_B64)
+    return b'$2b$%02d$' % rounds + encoded
+
+
 def hash_password(plain_password: str) -> bytes:
     """Hash a plaintext password with bcrypt (automatically salts).
 
@@ -86,19 +207,36 @@ def hash_password(plain_password: str) -> bytes:
     """
     if isinstance(plain_password, str):
         plain_password = plain_password.encode('utf-8')
-    # bcrypt.gensalt() default cost is reasonable; tune with rounds if needed
-    salt = bcrypt.gensalt()
-    h = bcrypt.hashpw(plain_password, salt)
+    salt = _gensalt(BCRYPT_ROUNDS)
+    h = _bcrypt_pool().submit(bcrypt.hashpw, plain_password, salt).result()
     return h
 
 
+# (sha256(password), stored_hash) -> checkpw result, oldest evicted first.
+# Keyed on a digest so plaintext passwords are never kept in memory.
+VERIFY_CACHE_SIZE = 1024
+_VERIFY_CACHE = OrderedDict()
+
+
 def verify_password(plain_password: str, stored_hash: bytes) -> bool:
     if isinstance(plain_password, str):
         plain_password = plain_password.encode('utf-8')
+    if not isinstance(stored_hash, bytes):
+        # memoryview / bytearray depending on the driver and cursor type
+        stored_hash = bytes(stored_hash)
+    key = (hashlib.sha256(plain_password).digest(), stored_hash)
+    cached = _VERIFY_CACHE.get(key)
+    if cached is not None:
+        _VERIFY_CACHE.move_to_end(key)
+        return cached
     try:
-        return bcrypt.checkpw(plain_password, stored_hash)
+        result = _bcrypt_pool().submit(bcrypt.checkpw, plain_password, stored_hash).result()
     except Exception:
         return False
+    _VERIFY_CACHE[key] = result
+    if len(_VERIFY_CACHE) > VERIFY_CACHE_SIZE:
+        _VERIFY_CACHE.popitem(last=False)
+    return result
 
 
 def signup(username: str, password: str) -> int:
@@ -115,16 +253,22 @@ def signup(username: str, password: str) -> int:
     conn = get_db_connection()
     try:
         cur = conn.cursor()
-        try:
-            cur.execute(
-                "INSERT INTO players (username, password_hash, date_created) VALUES (%s, %s, %s)",
-                (username, pw_hash, created),
-            )
-            conn.commit()
-            return cur.lastrowid
-        except mysql.connector.IntegrityError as e:
-            # duplicate username -> unique constraint violation
-            raise ValueError('username already exists') from e
+        # a taken name turns the INSERT into a no-op update: rowcount is 1
+        # for a new row and 0 for an existing one (the driver doesn't set
+        # CLIENT_FOUND_ROWS), so the duplicate case costs no failed statement
+        cur.execute(
+            "INSERT INTO players (username, password_hash, date_created) "
+            "VALUES (%s, %s, %s) "
+            "ON DUPLICATE KEY UPDATE player_id = LAST_INSERT_ID(player_id)",
+            (username, pw_hash, created),
+        )
+        if cur.rowcount != 1:
+            conn.rollback()
+            raise ValueError('username already exists')
+        conn.commit()
+        # new accounts are never admins; spare the caller an is_admin() query
+        _ADMIN_CACHE[cur.lastrowid] = (time.monotonic(), False)
+        return cur.lastrowid
     finally:
         cur.close()
         conn.close()
@@ -132,17 +276,18 @@ def signup(username: str, password: str) -> int:
 
 def login(username: str, password: str) -> int:
     """Verify credentials and return player_id on success. Raise ValueError on failure."""
-    conn = get_db_connection()
+    conn = get_db_connection(autocommit=True)
     try:
         cur = conn.cursor()
-        cur.execute("SELECT player_id, password_hash FROM players WHERE username = %s", (username,))
+        # is_admin comes along for free so the caller's follow-up is_admin()
+        # is answered from _ADMIN_CACHE instead of another round-trip
+        cur.execute("SELECT player_id, password_hash, is_admin FROM players WHERE username = %s LIMIT 1", (username,))
         row = cur.fetchone()
         if not row:
             raise ValueError('invalid-username-or-password')
-        player_id, pw_hash = row
-        if isinstance(pw_hash, memoryview):
-            pw_hash = bytes(pw_hash)
+        player_id, pw_hash, admin = row
         if verify_password(password, pw_hash):
+            _ADMIN_CACHE[player_id] = (time.monotonic(), bool(admin))
             return player_id
         raise ValueError('invalid-username-or-password')
     finally:
@@ -152,23 +297,92 @@ def login(username: str, password: str) -> int:
 
 # convenience: add score and progress operations
 def add_score(player_id: int, score: int, level: int = 1):
+    add_scores_bulk([(player_id, score, level)])
+
+
+def add_scores_bulk(rows):
+    """Insert several (player_id, score, level) rows in one transaction."""
+    if not rows:
+        return
+    now = datetime.utcnow()
     conn = get_db_connection()
     try:
         cur = conn.cursor()
-        cur.execute("INSERT INTO scores (player_id, score, date, level) VALUES (%s, %s, %s, %s)", (player_id, score, datetime.utcnow(), level))
+        cur.executemany(
+            "INSERT INTO scores (player_id, score, date, level) VALUES (%s, %s, %s, %s)",
+            [(pid, score, now, level) for pid, score, level in rows],
+        )
         conn.commit()
     finally:
         cur.close()
         conn.close()
 
 
+# Write-behind buffer for scores: queue_score() returns immediately and a
+# background thread commits whatever has queued up every SCORE_FLUSH_INTERVAL
+# seconds in one transaction, so many scores share a single redo-log flush.
+SCORE_FLUSH_INTERVAL = 0.05
+_SCORE_QUEUE = queue.Queue()
+_SCORE_WRITER = None
+
+
+def queue_score(player_id: int, score: int, level: int = 1):
+    """Record a score asynchronously. Use flush_scores() to wait for it."""
+    global _SCORE_WRITER
+    if _SCORE_WRITER is None:
+        _SCORE_WRITER = threading.Thread(target=_score_writer, name='score-writer', daemon=True)
+        _SCORE_WRITER.start()
+    _SCORE_QUEUE.put((player_id, score, level))
+
+
+def flush_scores():
+    """Block until every queued score has been written."""
+    _SCORE_QUEUE.join()
+
+
+def _score_writer():
+    while True:
+        batch = [_SCORE_QUEUE.get()]
+        time.sleep(SCORE_FLUSH_INTERVAL)
+        try:
+            while True:
+                batch.append(_SCORE_QUEUE.get_nowait())
+        except queue.Empty:
+            pass
+        try:
+            add_scores_bulk(batch)
+        except Exception as e:
+            print('Failed to save scores:', e)
+        finally:
+            for _ in batch:
+                _SCORE_QUEUE.task_done()
+
+
+TOP_SCORES_BATCH = 100
+
+
 def get_top_scores(limit: int = 10):
-    conn = get_db_connection()
+    """Yield (username, score, level, date) rows, best first.
+
+    Rows are streamed TOP_SCORES_BATCH at a time, so memory stays bounded
+    regardless of limit. Wrap in list() if the rows are needed more than once.
+    """
+    conn = get_db_connection(autocommit=True)
     try:
         cur = conn.cursor()
-        cur.execute("SELECT p.username, s.score, s.level, s.date FROM scores s JOIN players p ON p.player_id = s.player_id ORDER BY s.score DESC LIMIT %s", (limit,))
-        return cur.fetchall()
+        # STRAIGHT_JOIN keeps scores as the driving table so the LIMIT is served
+        # straight off idx_scores_score_desc without a filesort
+        cur.execute(
+            "SELECT p.username, s.score, s.level, s.date FROM scores s "
+            "STRAIGHT_JOIN players p USE INDEX (PRIMARY) ON p.player_id = s.player_id "
+            "ORDER BY s.score DESC LIMIT %s",
+            (limit,),
+        )
+        yield from iter(lambda: cur.fetchmany(TOP_SCORES_BATCH), [])
     finally:
+        if conn.unread_result:
+            # caller stopped early; drain so the connection can go back to the pool
+            conn.consume_results()
         cur.close()
         conn.close()
 
@@ -187,59 +401,105 @@ def update_user_credentials(player_id: int, new_username: str, new_password: str
     try:
         cur = conn.cursor()
         try:
+            # the uniqueness check rides along in the UPDATE (the derived table
+            # sidesteps MySQL's restriction on selecting from the updated table)
             cur.execute(
-                "UPDATE players SET username = %s, password_hash = %s WHERE player_id = %s",
-                (new_username, pw_hash, player_id)
+                "UPDATE players SET username = %s, password_hash = %s WHERE player_id = %s "
+                "AND NOT EXISTS (SELECT 1 FROM (SELECT player_id FROM players "
+                "WHERE username = %s AND player_id <> %s) taken)",
+                (new_username, pw_hash, player_id, new_username, player_id)
             )
             if cur.rowcount == 0:
-                raise ValueError('player not found')
+                conn.rollback()
+                # nothing updated: tell "no such player" apart from "name taken"
+                cur.execute("SELECT 1 FROM players WHERE player_id = %s", (player_id,))
+                if cur.fetchone() is None:
+                    raise ValueError('player not found')
+                raise ValueError('username already exists')
             conn.commit()
         except mysql.connector.IntegrityError as e:
-            # duplicate username -> unique constraint violation
+            # lost a race with a concurrent rename -> unique constraint violation
             raise ValueError('username already exists') from e
     finally:
         cur.close()
         conn.close()
 
 
+# is_admin results cached per player_id as (timestamp, value)
+ADMIN_CACHE_TTL = 60.0
+_ADMIN_CACHE = {}
+
+
 def is_admin(player_id: int) -> bool:
-    """Check if a player is an admin."""
-    conn = get_db_connection()
+    """Check if a player is an admin. Results are cached for ADMIN_CACHE_TTL seconds."""
+    cached = _ADMIN_CACHE.get(player_id)
+    if cached is not None and time.monotonic() - cached[0] < ADMIN_CACHE_TTL:
+        return cached[1]
+
+    conn = get_db_connection(autocommit=True)
     try:
         cur = conn.cursor()
         cur.execute("SELECT is_admin FROM players WHERE player_id = %s", (player_id,))
         row = cur.fetchone()
-        return bool(row and row[0]) if row else False
+        result = bool(row and row[0]) if row else False
     finally:
         cur.close()
         conn.close()
+    _ADMIN_CACHE[player_id] = (time.monotonic(), result)
+    return result
 
 
 def delete_user_scores(admin_id: int, target_username: str):
-    """Delete all scores for a user (admin only)."""
-    if not is_admin(admin_id):
-        raise ValueError('admin access required')
-    
+    """Delete all scores for a user (admin only).
+
+    The admin check is part of the DELETE itself, so the common path is a
+    single round-trip; the admin flag is only read back when nothing was
+    deleted.
+    """
     conn = get_db_connection()
     try:
         cur = conn.cursor()
-        cur.execute("DELETE s FROM scores s JOIN players p ON s.player_id = p.player_id WHERE p.username = %s", (target_username,))
+        cur.execute(
+            "DELETE s FROM scores s JOIN players p ON s.player_id = p.player_id "
+            "JOIN players a ON a.player_id = %s AND a.is_admin = TRUE "
+            "WHERE p.username = %s",
+            (admin_id, target_username),
+        )
         deleted_count = cur.rowcount
+        admin = True
+        if deleted_count == 0:
+            # either the target has no scores or the caller isn't an admin;
+            # read the flag fresh rather than trusting the cached is_admin()
+            cur.execute("SELECT is_admin FROM players WHERE player_id = %s", (admin_id,))
+            row = cur.fetchone()
+            admin = bool(row and row[0])
+            _ADMIN_CACHE[admin_id] = (time.monotonic(), admin)
         conn.commit()
-        return deleted_count
     finally:
         cur.close()
         conn.close()
 
+    if not admin:
+        raise ValueError('admin access required')
+    return deleted_count
+
 
 def make_admin(username: str):
     """Promote a user to admin status."""
     conn = get_db_connection()
     try:
         cur = conn.cursor()
-        cur.execute("UPDATE players SET is_admin = TRUE WHERE username = %s", (username,))
+        # skip the row write (and its lock) when the user is already an admin
+        cur.execute(
+            "UPDATE players SET is_admin = TRUE WHERE username = %s AND is_admin IS NOT TRUE",
+            (username,),
+        )
         if cur.rowcount == 0:
-            raise ValueError('user not found')
+            conn.rollback()
+            cur.execute("SELECT 1 FROM players WHERE username = %s", (username,))
+            if cur.fetchone() is None:
+                raise ValueError('user not found')
+            return
         conn.commit()
     finally:
         cur.close()
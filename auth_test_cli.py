@@ -7,7 +7,6 @@ Usage (PowerShell):
 Make sure DB env vars are set or default DB config matches your local MySQL.
 """
 import sys
-from auth import ensure_tables, signup, login, get_top_scores, add_score, make_admin
 
 
 def main():
@@ -15,10 +14,14 @@ def main():
         print('Usage: auth_test_cli.py <signup|login|schema|topscores|makeadmin> [args]')
         return
     cmd = sys.argv[1]
+    # auth (and with it bcrypt / mysql.connector) is imported per command so
+    # usage errors don't pay for loading the DB stack
     if cmd == 'schema':
+        from auth import ensure_tables
         ensure_tables()
         print('Ensured tables exist')
     elif cmd == 'signup':
+        from auth import signup
         if len(sys.argv) != 4:
             print('Usage: signup <username> <password>')
             return
@@ -30,6 +33,7 @@ def main():
         except Exception as e:
             print('Signup failed:', e)
     elif cmd == 'login':
+        from auth import login
         if len(sys.argv) != 4:
             print('Usage: login <username> <password>')
             return
@@ -41,10 +45,12 @@ def main():
         except Exception as e:
             print('Login failed:', e)
     elif cmd == 'topscores':
+        from auth import get_top_scores
         rows = get_top_scores()
         for r in rows:
             print(r)
     elif cmd == 'addscore':
+        from auth import add_score
         if len(sys.argv) != 4:
             print('Usage: addscore <player_id> <score>')
             return
@@ -53,6 +59,7 @@ def main():
         add_score(pid, s)
         print('score added')
     elif cmd == 'makeadmin':
+        from auth import make_admin
         if len(sys.argv) != 3:
             print('Usage: makeadmin <username>')
             return
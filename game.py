@@ -3,10 +3,18 @@ import random
 import os
 import sys
 from collections import deque
+from itertools import islice
 from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
 import math
 import wave
-import struct
+from array import array
+
+try:
+    import numpy as np
+except ImportError:
+    # NumPy is optional; the pure-Python paths below are used without it
+    np = None
 
 from auth import get_db_connection
 
@@ -23,7 +31,10 @@ pygame.init()
 
 # --- Constants ---
 WIDTH, HEIGHT = 800, 600
+SCREEN_RECT = pygame.Rect(0, 0, WIDTH, HEIGHT)
 FPS = 60
+# bilinear-filter scaled sprite art; plain nearest-neighbour scaling is much cheaper
+SMOOTH_SPRITES = False
 WHITE = (255, 255, 255)
 BLACK = (0, 0, 0)
 RED   = (200, 50, 50)
@@ -31,10 +42,25 @@ GREEN = (50, 200, 50)
 
 # --- Setup ---
 screen = pygame.display.set_mode((WIDTH, HEIGHT))
+# one period of the outline pulse 128 + 127*sin(t/250), sampled at 256 steps
+_PULSE_LUT = [128 + int(127 * math.sin(i * 2 * math.pi / 256)) for i in range(256)]
+_PULSE_STEP = 256 / (2 * math.pi * 250.0)  # LUT steps per millisecond
 pygame.display.set_caption("Anteater Game")
 clock = pygame.time.Clock()
 font = pygame.font.SysFont(None, 36)
 
+# (text, color) -> rendered surface, so unchanged labels aren't re-rasterized every frame
+_text_cache = {}
+TEXT_CACHE_MAX = 512
+
+def T(s, color=BLACK):
+    v = _text_cache.get((s, color))
+    if v is None:
+        if len(_text_cache) >= TEXT_CACHE_MAX:
+            _text_cache.clear()
+        v = _text_cache[(s, color)] = font.render(s, True, color).convert_alpha()
+    return v
+
 # Initialize mixer and ensure capture sound exists
 pygame.mixer.init(frequency=44100, size=-16, channels=2)
 
@@ -52,11 +78,14 @@ def make_capture_wav(path, freq=1200, duration=0.06, rate=44100):
         wf.setnchannels(1)
         wf.setsampwidth(2)
         wf.setframerate(rate)
-        frames = bytearray()
-        for i in range(nframes):
-            t = float(i) / rate
-            v = int(amplitude * math.sin(2.0 * math.pi * freq * t))
-            frames += struct.pack('<h', v)
+        if np is not None:
+            t = np.arange(nframes, dtype=np.float64) / rate
+            frames = (amplitude * np.sin(2.0 * np.pi * freq * t)).astype('<i2').tobytes()
+        else:
+            samples = array('h', (int(amplitude * math.sin(2.0 * math.pi * freq * i / rate)) for i in range(nframes)))
+            if sys.byteorder == 'big':
+                samples.byteswap()
+            frames = samples.tobytes()
         wf.writeframes(frames)
 
 if not os.path.isdir(ASSETS_DIR):
@@ -81,15 +110,35 @@ if os.path.exists(ANTEATER_PNG):
 
 # Import auth helpers
 try:
-    from auth import signup, login, add_score, get_top_scores, is_admin, delete_user_scores
+    from auth import (signup, login, queue_score, flush_scores, get_top_scores,
+                      is_admin, delete_user_scores)
 except Exception:
     # If auth is unavailable at import time, provide stubs so the game still runs
     def signup(u, p):
         raise RuntimeError('auth not available')
     def login(u, p):
         raise RuntimeError('auth not available')
-    def add_score(pid, s):
+    def queue_score(pid, s, level=1):
         pass
+    def flush_scores():
+        pass
+
+# arrow key -> tongue direction (checked in this order), and each direction's reverse
+_KEY_DIR = {pygame.K_LEFT: (-1, 0), pygame.K_RIGHT: (1, 0), pygame.K_UP: (0, -1), pygame.K_DOWN: (0, 1)}
+_REVERSE_DIR = {(-1, 0): (1, 0), (1, 0): (-1, 0), (0, -1): (0, 1), (0, 1): (0, -1)}
+
+_HAS_FBLITS = hasattr(pygame.Surface, 'fblits')
+
+def blit_batch(surf, seq, dirty=None):
+    # draw a list of (surface, position) pairs in one call; fblits only
+    # exists on pygame-ce, blits(doreturn=False) is the stock equivalent.
+    # The covered rects are appended to dirty when a list is given.
+    if dirty is not None:
+        dirty.extend(pygame.Rect(pos, img.get_size()) for img, pos in seq)
+    if _HAS_FBLITS:
+        surf.fblits(seq)
+    else:
+        surf.blits(seq, doreturn=False)
 
 # --- Classes ---
 class Anteater:
@@ -99,12 +148,19 @@ class Anteater:
 
         # Grid and snake-like tongue
         self.grid_size = grid_size
+        # last valid grid column/row; the screen size never changes mid-game
+        self._max_gx = WIDTH // grid_size - 1
+        self._max_gy = HEIGHT // grid_size - 1
         # tongue segments stored as (x, y) grid coords; origin is top-left of screen
         # tongue starts from the cell below the anteater (tongue shoots downward)
         start_x = (self.rect.centerx) // self.grid_size
         start_y = (self.rect.bottom) // self.grid_size
         self.tongue = deque()
         self.tongue.append((start_x, start_y))
+        # mirror of the tongue cells for O(1) self-collision checks
+        self._tongue_set = {(start_x, start_y)}
+        # tongue cells as an (N, 2) array of pixel coords; None when stale
+        self._tongue_arr = None
 
         # direction is a (dx, dy) tuple in grid units. default: down (0, 1)
         self.direction = (0, 1)
@@ -129,12 +185,35 @@ class Anteater:
         self.trapped_ants = []
         # ordered list of grid cells that form the loop (from head to collision)
         self.loop_path = []
+        # (loop_path, loop_cells) the cached outline polygon was traced from
+        self._poly_key = None
+        self._poly_pts = []
+        # loop polygon layers: the fill (with the outline punched out) and the
+        # outline alone, which is re-tinted each frame for the pulse; both are
+        # rasterized only when the traced polygon changes
+        self._loop_surf = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA).convert_alpha()
+        self._loop_outline_surf = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA).convert_alpha()
+        self._loop_layer_pts = None
+        self._loop_layer_area = None
+
+        # pre-drawn cell tiles: solid tongue segment and the loop cell border
+        self._tongue_cell = pygame.Surface((grid_size, grid_size)).convert()
+        self._tongue_cell.fill(RED)
+        self._loop_cell = pygame.Surface((grid_size, grid_size), pygame.SRCALPHA).convert_alpha()
+        self._loop_cell.fill((0, 0, 0, 0))
+        pygame.draw.rect(self._loop_cell, (255, 200, 200), self._loop_cell.get_rect(), 1)
+
+        # body sprite scaled to self.rect, rebuilt only if the rect size changes
+        self._art_scaled = None
+        self._art_scaled_size = None
 
     def reset_tongue(self):
         start_x = (self.rect.centerx) // self.grid_size
         start_y = (self.rect.bottom) // self.grid_size
         self.tongue = deque()
         self.tongue.append((start_x, start_y))
+        self._tongue_set = {(start_x, start_y)}
+        self._tongue_arr = None
         self.direction = (0, 1)
         self.next_direction = self.direction
         self.move_timer = 0
@@ -145,19 +224,13 @@ class Anteater:
         self.capture_timer = 0
 
     def handle_input(self, keys):
-        # Allow turning with arrow keys while extending; prevent direct reverse
-        if keys[pygame.K_LEFT]:
-            if self.direction != (1, 0):
-                self.next_direction = (-1, 0)
-        elif keys[pygame.K_RIGHT]:
-            if self.direction != (-1, 0):
-                self.next_direction = (1, 0)
-        elif keys[pygame.K_UP]:
-            if self.direction != (0, 1):
-                self.next_direction = (0, -1)
-        elif keys[pygame.K_DOWN]:
-            if self.direction != (0, -1):
-                self.next_direction = (0, 1)
+        # Allow turning with arrow keys while extending; prevent direct reverse.
+        # The first pressed key in _KEY_DIR order wins, as with an if/elif chain.
+        for key, d in _KEY_DIR.items():
+            if keys[key]:
+                if self.direction != _REVERSE_DIR[d]:
+                    self.next_direction = d
+                break
 
     def update(self):
         # move tongue on grid when extending
@@ -171,23 +244,21 @@ class Anteater:
                 new_head = (head_x + dx, head_y + dy)
 
                 # bounds check - prevent going off-screen
-                max_x = WIDTH // self.grid_size - 1
-                max_y = HEIGHT // self.grid_size - 1
                 nx, ny = new_head
-                if nx < 0 or nx > max_x or ny < 0 or ny > max_y:
+                if nx < 0 or nx > self._max_gx or ny < 0 or ny > self._max_gy:
                     # stop extending if out of bounds
                     self.extending = False
                     self.retracting = True
                     return
 
                 # self-collision detection: if new head hits existing segment -> loop formed
-                if new_head in list(self.tongue):
+                if new_head in self._tongue_set:
                     try:
-                        idx = list(self.tongue).index(new_head)
-                        loop_segment = list(self.tongue)[:idx+1]
+                        idx = self.tongue.index(new_head)
+                        loop_segment = list(islice(self.tongue, idx + 1))
                         # store ordered path and cells
                         self.loop_path = loop_segment[:]
-                        self.loop_cells = set(loop_segment)
+                        self.loop_cells = frozenset(loop_segment)
                         self.loop_active = True
                         # start capture timer and stop extending / start retracting
                         self.capture_timer = self.capture_delay_frames
@@ -199,6 +270,8 @@ class Anteater:
                     # extend
                     if len(self.tongue) < self.max_segments:
                         self.tongue.appendleft(new_head)
+                        self._tongue_set.add(new_head)
+                        self._tongue_arr = None
                     else:
                         # reached max length, stop extending and start retract
                         self.extending = False
@@ -211,9 +284,10 @@ class Anteater:
                 self.move_timer = 0
                 if len(self.tongue) > 1:
                     try:
-                        self.tongue.popleft()
+                        self._tongue_set.discard(self.tongue.popleft())
                     except Exception:
-                        self.tongue.pop()
+                        self._tongue_set.discard(self.tongue.pop())
+                    self._tongue_arr = None
                 else:
                     # fully retracted
                     self.retracting = False
@@ -225,89 +299,94 @@ class Anteater:
                     self.move_timer = 0
 
     def draw(self, surface):
+        """Draw tongue, body and loop border; returns the rect they cover."""
         # Draw tongue segments first so they appear to emerge from snout
-        for i, (gx, gy) in enumerate(self.tongue):
-            rect = pygame.Rect(gx * self.grid_size, gy * self.grid_size, self.grid_size, self.grid_size)
-            pygame.draw.rect(surface, RED, rect)
+        gs = self.grid_size
+        cell = self._tongue_cell
+        blit_batch(surface, [(cell, (gx * gs, gy * gs)) for gx, gy in self.tongue])
+        area = self.rect.copy()
+        if self.tongue:
+            area.union_ip(_cells_rect(self.tongue, gs))
 
         # Draw anteater body using artist PNG if provided, otherwise procedural sprite
-        global ANTEATER_SPRITE, ART_ANTEATER
-        if ART_ANTEATER is not None:
-            # scale artist art to rect size if needed
-            if ART_ANTEATER.get_width() != self.rect.width or ART_ANTEATER.get_height() != self.rect.height:
-                try:
-                    scaled = pygame.transform.smoothscale(ART_ANTEATER, (self.rect.width, self.rect.height))
-                    surface.blit(scaled, self.rect.topleft)
-                except Exception:
-                    surface.blit(ART_ANTEATER, self.rect.topleft)
-            else:
-                surface.blit(ART_ANTEATER, self.rect.topleft)
-        else:
-            if ANTEATER_SPRITE is None or ANTEATER_SPRITE.get_width() != self.rect.width or ANTEATER_SPRITE.get_height() != self.rect.height:
-                ANTEATER_SPRITE = create_anteater_sprite(self.rect.width, self.rect.height)
-            surface.blit(ANTEATER_SPRITE, self.rect.topleft)
+        size = (self.rect.width, self.rect.height)
+        if self._art_scaled_size != size:
+            self._art_scaled = self._build_body_sprite(size)
+            self._art_scaled_size = size
+        surface.blit(self._art_scaled, self.rect.topleft)
 
         # Optionally highlight loop cells with subtle border
         if self.loop_active and self.loop_cells:
-            for (gx, gy) in self.loop_cells:
-                rect = pygame.Rect(gx * self.grid_size, gy * self.grid_size, self.grid_size, self.grid_size)
-                pygame.draw.rect(surface, (255, 200, 200), rect, 1)
+            cell = self._loop_cell
+            blit_batch(surface, [(cell, (gx * gs, gy * gs)) for gx, gy in self.loop_cells])
+            area.union_ip(_cells_rect(self.loop_cells, gs))
+        return area
+
+    def draw_loop(self, surface, ticks):
+        """Draw the filled loop polygon with its pulsing outline.
+
+        Returns the rect covered, or None when there is no loop to draw.
+        """
+        if not (self.loop_active and self.loop_path):
+            return None
+        poly_pts = self.get_loop_polygon_pixels()
+        if not poly_pts:
+            return None
+        if poly_pts is not self._loop_layer_pts:
+            self._loop_layer_pts = poly_pts
+            self._loop_surf.fill((0, 0, 0, 0))
+            self._loop_outline_surf.fill((0, 0, 0, 0))
+            area = pygame.draw.polygon(self._loop_surf, (255, 150, 150, 90), poly_pts)
+            # draw outline slightly thicker by drawing multiple outlines
+            pygame.draw.polygon(self._loop_surf, (0, 0, 0, 0), poly_pts, 3)
+            area.union_ip(pygame.draw.polygon(self._loop_outline_surf, (255, 80, 80), poly_pts, 3))
+            self._loop_layer_area = area
+        area = self._loop_layer_area
+        # pulsing outline alpha
+        self._loop_outline_surf.set_alpha(_PULSE_LUT[int(ticks * _PULSE_STEP) & 255])
+        surface.blit(self._loop_surf, area, area)
+        surface.blit(self._loop_outline_surf, area, area)
+        return area
+
+    def _build_body_sprite(self, size):
+        global ANTEATER_SPRITE
+        if ART_ANTEATER is not None:
+            # scale artist art to rect size if needed
+            if ART_ANTEATER.get_size() == size:
+                return ART_ANTEATER
+            scale = pygame.transform.smoothscale if SMOOTH_SPRITES else pygame.transform.scale
+            try:
+                return scale(ART_ANTEATER, size).convert_alpha()
+            except Exception:
+                return ART_ANTEATER
+        if ANTEATER_SPRITE is None or ANTEATER_SPRITE.get_size() != size:
+            ANTEATER_SPRITE = create_anteater_sprite(*size)
+        return ANTEATER_SPRITE
 
     def get_tongue_cells(self):
         return list(self.tongue)
 
+    def get_tongue_array(self):
+        # top-left pixel of every tongue cell, rebuilt only after the tongue moves
+        if self._tongue_arr is None:
+            self._tongue_arr = np.array(self.tongue, dtype=np.int32).reshape(-1, 2) * self.grid_size
+        return self._tongue_arr
+
     def get_loop_polygon_pixels(self):
+        # the loop only changes when a new one closes (both attributes are
+        # replaced, never mutated), so reuse the last traced outline
+        key = self._poly_key
+        if key is None or key[0] is not self.loop_path or key[1] is not self.loop_cells:
+            self._poly_pts = self._trace_loop_polygon()
+            self._poly_key = (self.loop_path, self.loop_cells)
+        return self._poly_pts
+
+    def _trace_loop_polygon(self):
         # produce an ordered polygon outlining the set of loop cells
         if not self.loop_cells:
             return []
         if self.loop_path and len(self.loop_path) >= self.min_loop_area:
-            cells = set(self.loop_path)
-            edges = set()
-            for (gx, gy) in cells:
-                x0 = gx * self.grid_size
-                y0 = gy * self.grid_size
-                x1 = x0 + self.grid_size
-                y1 = y0 + self.grid_size
-                neighbors = [(gx, gy-1), (gx+1, gy), (gx, gy+1), (gx-1, gy)]
-                corners = [(x0, y0), (x1, y0), (x1, y1), (x0, y1)]
-                for i, n in enumerate(neighbors):
-                    if n not in cells:
-                        a = corners[i]
-                        b = corners[(i+1) % 4]
-                        edges.add((a, b))
-
-            if not edges:
-                return []
-
-            adj = {}
-            for a, b in edges:
-                adj.setdefault(a, []).append(b)
-
-            start = min(adj.keys(), key=lambda p: (p[1], p[0]))
-            poly = [start]
-            cur = start
-            prev = None
-            max_steps = len(edges) * 3
-            steps = 0
-            while steps < max_steps:
-                steps += 1
-                nexts = adj.get(cur, [])
-                if not nexts:
-                    break
-                nxt = None
-                for c in nexts:
-                    if c != prev:
-                        nxt = c
-                        break
-                if nxt is None:
-                    nxt = nexts[0]
-                if nxt == start:
-                    break
-                poly.append(nxt)
-                prev = cur
-                cur = nxt
-
-            return poly
+            return trace_contour(set(self.loop_path), self.grid_size)
 
         # fallback: centroid-sorted
         pts = []
@@ -322,6 +401,42 @@ class Anteater:
         pts.sort(key=lambda p: math.atan2(p[1]-cy, p[0]-cx))
         return pts
 
+def _cells_rect(cells, grid_size):
+    # pixel rect spanning a collection of (gx, gy) grid cells
+    xs = [gx for gx, _ in cells]
+    ys = [gy for _, gy in cells]
+    x0, y0 = min(xs) * grid_size, min(ys) * grid_size
+    return pygame.Rect(x0, y0, (max(xs) + 1) * grid_size - x0, (max(ys) + 1) * grid_size - y0)
+
+def trace_contour(cells, grid_size):
+    # Walk the outline of a set of grid cells clockwise, starting at the
+    # top-left corner of the topmost-leftmost cell, keeping the region on the
+    # right. Returns every lattice corner along the way as pixel coords.
+    if not cells:
+        return []
+    gx, gy = min(cells, key=lambda c: (c[1], c[0]))
+    start = (gx, gy)
+    vx, vy = start
+    dx, dy = 1, 0
+    poly = []
+    for _ in range(4 * len(cells) + 4):
+        poly.append((vx * grid_size, vy * grid_size))
+        # try a right turn, then straight on, then a left turn
+        for ndx, ndy in ((-dy, dx), (dx, dy), (dy, -dx)):
+            # cells to the right / left of the edge leaving (vx, vy) in this direction
+            right = (vx + min(ndx, 0) + min(-ndy, 0), vy + min(ndy, 0) + min(ndx, 0))
+            left = (vx + min(ndx, 0) + min(ndy, 0), vy + min(ndy, 0) + min(-ndx, 0))
+            if right in cells and left not in cells:
+                dx, dy = ndx, ndy
+                break
+        else:
+            break
+        vx += dx
+        vy += dy
+        if (vx, vy) == start:
+            break
+    return poly
+
 class Ant:
     """Ant that spawns on screen edges (excluding top) and uses tank-like controls.
 
@@ -329,6 +444,11 @@ class Ant:
     which are picked randomly every few frames.
     """
     SIZE = 20
+    # furthest top-left position that keeps the ant on screen
+    MAX_X = WIDTH - SIZE
+    MAX_Y = HEIGHT - SIZE
+    __slots__ = ('trapped', 'trapped_pos', 'rect', 'x', 'y', 'angle', 'speed', 'throttle',
+                 'turn', 'rotation_speed', 'accel', 'max_speed', 'behavior_timer')
 
     def __init__(self):
         self.trapped = False
@@ -339,22 +459,22 @@ class Ant:
         edge = random.choice(edges)
         margin = 10
         min_y = max(anteater.rect.bottom + 20, margin)
-        max_y = HEIGHT - self.SIZE - margin
+        max_y = self.MAX_Y - margin
         if min_y > max_y:
             min_y = margin
-            max_y = HEIGHT - self.SIZE - margin
+            max_y = self.MAX_Y - margin
 
         if edge == 'left':
             x = margin
             y = random.randint(min_y, max_y)
             angle = 0.0  # pointing right
         elif edge == 'right':
-            x = WIDTH - self.SIZE - margin
+            x = self.MAX_X - margin
             y = random.randint(min_y, max_y)
             angle = math.pi  # pointing left
         else:  # bottom
-            x = random.randint(margin, WIDTH - self.SIZE - margin)
-            y = HEIGHT - self.SIZE - margin
+            x = random.randint(margin, self.MAX_X - margin)
+            y = self.MAX_Y - margin
             angle = -math.pi/2  # pointing up
 
         self.rect = pygame.Rect(int(x), int(y), self.SIZE, self.SIZE)
@@ -405,14 +525,14 @@ class Ant:
         if self.x < 0:
             self.x = 0
             bounced = True
-        if self.x + self.SIZE > WIDTH:
-            self.x = WIDTH - self.SIZE
+        if self.x > self.MAX_X:
+            self.x = self.MAX_X
             bounced = True
         if self.y < 0:
             self.y = 0
             bounced = True
-        if self.y + self.SIZE > HEIGHT:
-            self.y = HEIGHT - self.SIZE
+        if self.y > self.MAX_Y:
+            self.y = self.MAX_Y
             bounced = True
 
         if bounced:
@@ -422,16 +542,31 @@ class Ant:
         self.rect.x = int(self.x)
         self.rect.y = int(self.y)
 
+    def get_blit(self):
+        global ANT_SPRITE_ROTATIONS
+        if ANT_SPRITE_ROTATIONS is None:
+            ANT_SPRITE_ROTATIONS = build_ant_rotations(self.SIZE)
+        # pick the pre-rotated sprite nearest to the current angle
+        bins = len(ANT_SPRITE_ROTATIONS)
+        rot = ANT_SPRITE_ROTATIONS[round(self.angle / (2 * math.pi) * bins) % bins]
+        return rot, rot.get_rect(center=self.rect.center).topleft
+
     def draw(self, surface):
-        global ANT_SPRITE
-        if ANT_SPRITE is None:
-            ANT_SPRITE = create_ant_sprite(self.SIZE)
-        # rotate sprite surface according to angle
-        rot = pygame.transform.rotate(ANT_SPRITE, -math.degrees(self.angle))
-        r = rot.get_rect(center=self.rect.center)
-        surface.blit(rot, r.topleft)
+        surface.blit(*self.get_blit())
+
+def init_surfaces():
+    """Create the long-lived shared surfaces, converted to the display format.
+
+    Must run after pygame.display.set_mode() so convert()/convert_alpha() can
+    match the screen's pixel format.
+    """
+    global TRAPPED_ANT
+    # opaque black square drawn (with surface alpha) for each trapped ant
+    TRAPPED_ANT = pygame.Surface((Ant.SIZE, Ant.SIZE)).convert()
+    TRAPPED_ANT.fill(BLACK)
 
 # --- Game Setup ---
+init_surfaces()
 anteater = Anteater(grid_size=20)
 initial_ants = 6
 ants = [Ant() for _ in range(initial_ants)]
@@ -439,6 +574,10 @@ score = 0
 particles = []
 popups = []
 MAX_PARTICLES = 120
+# rects drawn last frame (None after a full-screen overlay) and the most rects
+# a partial display update is still worth it for
+prev_dirty_rects = None
+DIRTY_RECTS_MAX = 40
 
 # Level / difficulty ramp (level increases every 60 seconds)
 # game_start_ticks is None until the player actually starts playing (after login)
@@ -459,10 +598,20 @@ def create_ant_sprite(size, color=(20,20,20)):
     pygame.draw.circle(surf, (0,0,0), (cx + size//6, cy - size//6), max(1, eye_r//2))
     pygame.draw.circle(surf, (255,255,255), (cx + size//12, cy - size//6), eye_r)
     pygame.draw.circle(surf, (0,0,0), (cx + size//12, cy - size//6), max(1, eye_r//2))
-    return surf
+    return surf.convert_alpha()
 
 ANT_SPRITE = None
 
+# ANT_SPRITE pre-rotated into evenly spaced angles, built on first draw
+ANT_ROTATION_BINS = 64
+ANT_SPRITE_ROTATIONS = None
+
+def build_ant_rotations(size, bins=ANT_ROTATION_BINS):
+    global ANT_SPRITE
+    if ANT_SPRITE is None:
+        ANT_SPRITE = create_ant_sprite(size)
+    return [pygame.transform.rotate(ANT_SPRITE, -360.0 * i / bins).convert_alpha() for i in range(bins)]
+
 # Anteater sprite cache
 ANTEATER_SPRITE = None
 
@@ -486,12 +635,76 @@ def create_anteater_sprite(w, h):
     ey = int(h*0.35)
     pygame.draw.circle(surf, eye_color, (ex, ey), max(2, w//20))
     pygame.draw.circle(surf, pupil, (ex, ey), max(1, w//40))
-    return surf
+    return surf.convert_alpha()
 
 # Game over / high score state
 dead = False
 show_scores = False
 top_scores = []
+top_scores_future = None
+
+# single worker so DB calls made from the game loop run in submission order
+db_executor = ThreadPoolExecutor(max_workers=1)
+
+# limit -> (tick fetched, rows); only touched from the db_executor worker
+_top_scores_cache = {}
+TOP_SCORES_TTL_MS = 5000
+
+def cached_top_scores(n):
+    # reuse a recent fetch instead of querying again on every game over
+    now = pygame.time.get_ticks()
+    hit = _top_scores_cache.get(n)
+    if hit is not None and now - hit[0] <= TOP_SCORES_TTL_MS:
+        return hit[1]
+    # scores are written behind by auth's queue; make sure they have landed
+    flush_scores()
+    rows = list(get_top_scores(n))
+    _top_scores_cache[n] = (now, rows)
+    return rows
+
+def save_score(pid, s, level):
+    # hand a finished game to auth's batching writer thread and drop cached
+    # tables so the next fetch (which flushes that queue first) shows it
+    queue_score(pid, s, level)
+    _top_scores_cache.clear()
+
+def score_table_blits(rows):
+    """Format and render the game-over high-score table as (surface, pos) pairs."""
+    title = T('Game Over - High Scores', WHITE)
+    blits = [(title, (WIDTH//2 - title.get_width()//2, 80))]
+    # list top scores (row: username, score, level, date)
+    y = 140
+    idx = 1
+    for row in rows:
+        try:
+            uname = row[0]
+            sc = row[1]
+            lvl = row[2] if len(row) > 2 else '?'
+            dt = row[3] if len(row) > 3 else None
+        except Exception:
+            # fallback if shape unexpected
+            uname = str(row[0]) if len(row) > 0 else 'unknown'
+            sc = row[1] if len(row) > 1 else 0
+            lvl = row[2] if len(row) > 2 else '?'
+            dt = row[3] if len(row) > 3 else None
+
+        # format date if possible
+        date_str = ''
+        try:
+            if dt is None:
+                date_str = ''
+            elif hasattr(dt, 'strftime'):
+                date_str = dt.strftime('%Y-%m-%d %H:%M')
+            else:
+                date_str = str(dt)
+        except Exception:
+            date_str = str(dt)
+
+        txt = T(f'{idx}. {uname} — {sc} (L{lvl}) {date_str}', WHITE)
+        blits.append((txt, (WIDTH//2 - txt.get_width()//2, y)))
+        y += 30
+        idx += 1
+    return blits
 
 # --- Simple Text Input helper for Pygame ---
 class TextInput:
@@ -517,7 +730,7 @@ class TextInput:
         pygame.draw.rect(surf, (230, 230, 230), self.rect)
         pygame.draw.rect(surf, BLACK, self.rect, 2 if self.active else 1)
         disp = '*' * len(self.text) if self.hidden else self.text
-        txt = font.render(disp, True, BLACK)
+        txt = T(disp)
         surf.blit(txt, (self.rect.x + 4, self.rect.y + (self.rect.height - txt.get_height())//2))
 
 # --- Auth / UI state ---
@@ -529,8 +742,8 @@ auth_message = ''
 
 # --- Settings Menu State ---
 show_settings = False
-settings_username_input = TextInput(250, 200, 300, 40, '')
-settings_password_input = TextInput(250, 260, 300, 40, '', hidden=True)
+settings_username_input = TextInput(200, 190, 400, 40, '')
+settings_password_input = TextInput(200, 280, 400, 40, '', hidden=True)
 settings_message = ''
 
 # --- Admin State ---
@@ -539,6 +752,153 @@ is_current_user_admin = False
 admin_target_input = TextInput(200, 280, 400, 40, '')
 admin_message = ''
 
+# --- Menu overlays ---
+def make_button(size, color, label, offset):
+    # opaque button face with its label, rendered once
+    surf = pygame.Surface(size).convert()
+    surf.fill(color)
+    surf.blit(label, (offset, 6))
+    return surf
+
+# every menu button face, keyed by name; the Rects for hit-testing live on the overlays
+BUTTONS = {
+    'restart': make_button((100, 40), (100,200,100), T('Restart'), 10),
+    'quit': make_button((100, 40), (200,100,100), T('Quit'), 30),
+    'login': make_button((140, 40), (100,200,100), T('Login'), 30),
+    'signup': make_button((140, 40), (100,100,200), T('Signup'), 20),
+    'update': make_button((140, 40), (100,200,100), T('Update'), 30),
+    'cancel': make_button((140, 40), (200,100,100), T('Cancel'), 30),
+    'delete': make_button((180, 40), (200,50,50), T('Delete Scores', WHITE), 20),
+    'admin_cancel': make_button((140, 40), (100,100,100), T('Cancel', WHITE), 30),
+}
+
+class Overlay:
+    """Full-screen menu layer, re-rendered only when what it shows changes.
+
+    Subclasses draw into ``self.surface`` in ``_rebuild`` and describe their
+    content with ``content_key``; ``render`` rebuilds only when that key
+    differs from the last one (so input edits invalidate the layer through
+    the text they put in the key) and otherwise just blits the cached layer. The layer is kept premultiplied so text anti-aliased over
+    the translucent dim composites exactly as if drawn onto the screen.
+    """
+    dim_alpha = 180
+
+    def __init__(self):
+        self.surface = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA).convert_alpha()
+        self._key = None
+
+    def content_key(self, *content):
+        return content
+
+    def _rebuild(self, *content):
+        # the base layer is just the dim
+        pass
+
+    def render(self, screen, *content):
+        key = self.content_key(*content)
+        if key != self._key:
+            self.surface.fill((0, 0, 0, self.dim_alpha))
+            self._rebuild(*content)
+            self._key = key
+        screen.blit(self.surface, (0, 0), special_flags=pygame.BLEND_PREMULTIPLIED)
+
+    def _text(self, txt, pos):
+        self.surface.blit(txt.premul_alpha(), pos, special_flags=pygame.BLEND_PREMULTIPLIED)
+
+    def _centered(self, txt, y):
+        self._text(txt, (WIDTH//2 - txt.get_width()//2, y))
+
+    def _button(self, rect, name):
+        self.surface.blit(BUTTONS[name], rect)
+
+
+class ScoresOverlay(Overlay):
+    dim_alpha = 200
+    restart_btn = pygame.Rect(WIDTH//2 - 120, HEIGHT - 140, 100, 40)
+    quit_btn = pygame.Rect(WIDTH//2 + 20, HEIGHT - 140, 100, 40)
+
+    def _rebuild(self, rows):
+        for txt, pos in score_table_blits(rows):
+            self._text(txt, pos)
+        # restart and quit buttons
+        self._button(self.restart_btn, 'restart')
+        self._button(self.quit_btn, 'quit')
+
+
+class LoginOverlay(Overlay):
+    dim_alpha = 120
+    login_btn = pygame.Rect(250, 320, 140, 40)
+    signup_btn = pygame.Rect(410, 320, 140, 40)
+
+    def __init__(self, username, password):
+        super().__init__()
+        self.inputs = (username, password)
+
+    def content_key(self, message):
+        return (message,) + tuple((i.text, i.active) for i in self.inputs)
+
+    def _rebuild(self, message):
+        self._centered(T('Login / Signup', WHITE), 120)
+        for field in self.inputs:
+            field.draw(self.surface)
+        self._button(self.login_btn, 'login')
+        self._button(self.signup_btn, 'signup')
+        if message:
+            self._centered(T(message, (255,220,220)), 380)
+
+
+class SettingsOverlay(Overlay):
+    update_btn = pygame.Rect(200, 350, 140, 40)
+    cancel_btn = pygame.Rect(360, 350, 140, 40)
+
+    def __init__(self, username, password):
+        super().__init__()
+        self.inputs = (username, password)
+
+    def content_key(self, message):
+        return (message,) + tuple((i.text, i.active) for i in self.inputs)
+
+    def _rebuild(self, message):
+        self._centered(T('Settings', WHITE), 100)
+        # Username and password inputs with better spacing
+        self._text(T('New Username:', WHITE), (200, 160))
+        self.inputs[0].draw(self.surface)
+        self._text(T('New Password:', WHITE), (200, 250))
+        self.inputs[1].draw(self.surface)
+        self._button(self.update_btn, 'update')
+        self._button(self.cancel_btn, 'cancel')
+        self._centered(T('Press ESC to close settings', (200,200,200)), 420)
+        if message:
+            self._centered(T(message, (255,220,220)), 450)
+
+
+class AdminOverlay(Overlay):
+    delete_btn = pygame.Rect(200, 350, 180, 40)
+    cancel_btn = pygame.Rect(400, 350, 140, 40)
+
+    def __init__(self, target):
+        super().__init__()
+        self.target = target
+
+    def content_key(self, message):
+        return (message, self.target.text, self.target.active)
+
+    def _rebuild(self, message):
+        self._centered(T('Admin Panel', WHITE), 100)
+        self._text(T('Username to remove scores:', WHITE), (200, 250))
+        self.target.draw(self.surface)
+        self._button(self.delete_btn, 'delete')
+        self._button(self.cancel_btn, 'admin_cancel')
+        self._centered(T('Press F1 to close admin panel', (200,200,200)), 420)
+        if message:
+            self._centered(T(message, (255,220,220)), 450)
+
+
+scores_overlay = ScoresOverlay()
+login_overlay = LoginOverlay(username_input, password_input)
+settings_overlay = SettingsOverlay(settings_username_input, settings_password_input)
+admin_overlay = AdminOverlay(admin_target_input)
+
 def point_in_polygon(x, y, polygon):
     # ray casting algorithm for point in polygon (polygon as list of (x,y))
     inside = False
@@ -559,6 +919,18 @@ def capture_ants_in_loop(anteater, ants_list):
     if not pts:
         return []
 
+    if np is not None and len(pts) >= 3 and ants_list:
+        # batched ray casting: every ant against every polygon edge at once
+        poly = np.asarray(pts, dtype=np.float64)
+        x1, y1 = poly.T
+        x2, y2 = np.roll(poly, -1, axis=0).T
+        ax = np.fromiter((a.rect.centerx for a in ants_list), dtype=np.float64, count=len(ants_list))[:, None]
+        ay = np.fromiter((a.rect.centery for a in ants_list), dtype=np.float64, count=len(ants_list))[:, None]
+        crosses = (y1 > ay) != (y2 > ay)
+        x_at_y = (x2 - x1) * (ay - y1) / (y2 - y1 + 1e-9) + x1
+        inside = np.bitwise_xor.reduce(crosses & (ax < x_at_y), axis=1)
+        return [ants_list[i] for i in np.flatnonzero(inside)]
+
     captured = []
     for ant in ants_list:
         ax = ant.rect.centerx
@@ -569,7 +941,12 @@ def capture_ants_in_loop(anteater, ants_list):
     return captured
 
 
+# (color, alpha level) -> pre-filled 6x6 particle square
+_PARTICLE_SURF_CACHE = {}
+
 class Particle:
+    __slots__ = ('x', 'y', 'vx', 'vy', 'color', 'life')
+
     def __init__(self, pos, vel, color, life=30):
         self.x, self.y = pos
         self.vx, self.vy = vel
@@ -581,41 +958,100 @@ class Particle:
         self.y += self.vy
         self.vy += 0.15  # gravity-ish
         self.life -= 1
+        return self.life > 0
 
     def draw(self, surf):
-        if self.life <= 0:
-            return
+        if self.life > 0:
+            surf.blit(*self.get_blit())
+
+    def get_blit(self):
         alpha = max(20, min(255, int(255 * (self.life / 30.0))))
-        s = pygame.Surface((6, 6), pygame.SRCALPHA)
-        s.fill((*self.color, alpha))
-        surf.blit(s, (int(self.x), int(self.y)))
+        # quantize alpha to 8 levels so a handful of cached squares cover every particle
+        key = (self.color, alpha >> 5)
+        s = _PARTICLE_SURF_CACHE.get(key)
+        if s is None:
+            s = pygame.Surface((6, 6), pygame.SRCALPHA).convert_alpha()
+            s.fill((*self.color, (alpha >> 5 << 5) | 31))
+            _PARTICLE_SURF_CACHE[key] = s
+        return s, (int(self.x), int(self.y))
+
+
+def draw_particles(surf, particle_list, dirty=None):
+    """Draw all live particles with one batched blit of their cached squares.
+
+    Squares that have flown fully off-screen are not submitted at all. The
+    drawn areas are appended to dirty when a list is given.
+    """
+    blit_batch(surf, [p.get_blit() for p in particle_list
+                      if p.life > 0 and -6 < p.x < WIDTH and -6 < p.y < HEIGHT], dirty)
+
+
+# expired particles waiting to be reused, pre-filled up to the on-screen cap
+_particle_free = [Particle.__new__(Particle) for _ in range(MAX_PARTICLES)]
+
+def acquire_particle(pos, vel, color, life=30):
+    # re-initialise an expired particle from the free list instead of allocating
+    p = _particle_free.pop() if _particle_free else Particle.__new__(Particle)
+    p.__init__(pos, vel, color, life)
+    return p
 
 
 class ScorePopup:
+    __slots__ = ('x', 'y', 'text', 'color', 'life', 'initial_life', '_surf')
+
     def __init__(self, pos, text, color=(255,255,100), life=60):
         self.x, self.y = pos
         self.text = text
         self.color = color
         self.life = life
         self.initial_life = life
+        # the text never changes, so rasterize it once
+        self._surf = font.render(text, True, color).convert_alpha()
 
     def update(self):
         self.y -= 0.6
         self.life -= 1
+        return self.life > 0
 
-    def draw(self, surf):
+    def get_blit(self):
         alpha = max(0, min(255, int(255 * (self.life / self.initial_life))))
-        txt = font.render(self.text, True, self.color)
-        s = pygame.Surface((txt.get_width(), txt.get_height()), pygame.SRCALPHA)
-        s.blit(txt, (0,0))
-        s.set_alpha(alpha)
-        surf.blit(s, (int(self.x - txt.get_width()/2), int(self.y - txt.get_height()/2)))
+        self._surf.set_alpha(alpha)
+        return self._surf, (int(self.x - self._surf.get_width()/2), int(self.y - self._surf.get_height()/2))
+
+    def draw(self, surf):
+        surf.blit(*self.get_blit())
+
+
+# expired popups waiting to be reused
+_popup_free = []
+
+def acquire_popup(pos, text, color=(255,255,100), life=60):
+    # reuse an expired popup; its rendered text is kept when the label is the same
+    if not _popup_free:
+        return ScorePopup(pos, text, color, life)
+    p = _popup_free.pop()
+    if p.text == text and p.color == color:
+        p.x, p.y = pos
+        p.life = p.initial_life = life
+    else:
+        p.__init__(pos, text, color, life)
+    return p
+
+def build_ant_grid(ants_list, cell):
+    # spatial hash: grid cell -> ants whose rect overlaps that cell
+    grid = {}
+    for a in ants_list:
+        r = a.rect
+        for gx in range(r.left // cell, (r.right - 1) // cell + 1):
+            for gy in range(r.top // cell, (r.bottom - 1) // cell + 1):
+                grid.setdefault((gx, gy), []).append(a)
+    return grid
 
 def check_player_death():
     global dead
     # if any ant (non-trapped) collides with anteater rect => death
     for a in ants:
-        if not getattr(a, 'trapped', False) and a.rect.colliderect(anteater.rect):
+        if not a.trapped and a.rect.colliderect(anteater.rect):
             dead = True
             return True
     return False
@@ -624,10 +1060,17 @@ def check_player_death():
 running = True
 while running:
     clock.tick(FPS)
+    # one timestamp for everything in this frame
+    now_ticks = pygame.time.get_ticks()
 
+    # left-click positions from this frame's events; buttons react to the
+    # press itself rather than to the button being held down
+    clicks_this_frame = []
     for event in pygame.event.get():
         if event.type == pygame.QUIT:
             running = False
+        elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+            clicks_this_frame.append(event.pos)
 
         # If user not logged in, route events to input boxes
         if current_player_id is None:
@@ -670,7 +1113,7 @@ while running:
                     # reset tongue and release any trapped ants
                     anteater.reset_tongue()
                     for a in ants:
-                        if getattr(a, 'trapped', False):
+                        if a.trapped:
                             a.trapped = False
                             a.trapped_pos = None
                     anteater.trapped_ants = []
@@ -683,18 +1126,22 @@ while running:
                 anteater.extending = False
                 anteater.retracting = True
 
+    # pause state for the rest of the frame
+    menus_open = show_settings or show_admin
+    game_active = not menus_open and current_player_id is not None and not show_scores and not dead
+
     # read continuous key state for turning (only when menus not open)
-    if not show_settings and not show_admin:
+    if not menus_open:
         keys = pygame.key.get_pressed()
         anteater.handle_input(keys)
 
     # --- Update ---
     # Only update game when not paused by menus, login, or game over
-    if not show_settings and not show_admin:
+    if not menus_open:
         anteater.update()
-        for ant in ants:
-            # Only update ants when not paused by login overlay or showing scores
-            if current_player_id is not None and not show_scores and not dead:
+        # Only update ants when not paused by login overlay or showing scores
+        if game_active:
+            for ant in ants:
                 ant.update()
     # If a loop has just formed, mark ants inside as trapped and start capture timer (only when not in settings)
     if not show_settings and anteater.loop_active and anteater.trapped_ants == []:
@@ -713,28 +1160,30 @@ while running:
 
     # Tongue collision: if any ant touches a tongue segment while tongue exists, capture immediately (only when not in settings)
     if not show_settings and anteater.get_tongue_cells():
-        # build tongue rects
-        tongue_rects = []
-        for (gx, gy) in anteater.get_tongue_cells():
-            r = pygame.Rect(gx * anteater.grid_size, gy * anteater.grid_size, anteater.grid_size, anteater.grid_size)
-            tongue_rects.append(r)
-        to_remove = []
-        for ant in ants:
-            if getattr(ant, 'trapped', False):
-                continue
-            # rectangle overlap check
-            collided = False
-            for tr in tongue_rects:
-                if ant.rect.colliderect(tr):
-                    collided = True
-                    break
-            if collided:
-                to_remove.append(ant)
+        if np is not None:
+            # overlap test of every free ant against every tongue cell at once
+            free_ants = [a for a in ants if not a.trapped]
+            to_remove = []
+            if free_ants:
+                gs = anteater.grid_size
+                tongue = anteater.get_tongue_array()
+                tx = tongue[:, 0]
+                ty = tongue[:, 1]
+                boxes = np.array([(a.rect.x, a.rect.y, a.rect.right, a.rect.bottom) for a in free_ants], dtype=np.int32)
+                overlap = ((boxes[:, 0, None] < tx + gs) & (boxes[:, 2, None] > tx)
+                           & (boxes[:, 1, None] < ty + gs) & (boxes[:, 3, None] > ty))
+                to_remove = [free_ants[i] for i in np.flatnonzero(overlap.any(axis=1))]
+        else:
+            # only ants bucketed into a tongue cell can touch the tongue
+            ant_grid = build_ant_grid(ants, anteater.grid_size)
+            hit = set()
+            for cell in anteater.get_tongue_cells():
+                for ant in ant_grid.get(cell, ()):
+                    if not ant.trapped:
+                        hit.add(ant)
+            to_remove = [ant for ant in ants if ant in hit]
+        new_ants = []
         for ant in to_remove:
-            try:
-                ants.remove(ant)
-            except ValueError:
-                pass
             # spawn capture particles at ant center
             for i in range(8):
                 if len(particles) >= MAX_PARTICLES:
@@ -743,7 +1192,7 @@ while running:
                 spd = random.uniform(1.0, 3.0)
                 vx = math.cos(ang) * spd
                 vy = math.sin(ang) * spd
-                particles.append(Particle((ant.rect.centerx, ant.rect.centery), (vx, vy), (255, 200, 50), life=30))
+                particles.append(acquire_particle((ant.rect.centerx, ant.rect.centery), (vx, vy), (255, 200, 50), life=30))
             # sound on capture
             try:
                 # play capture sound if available
@@ -754,11 +1203,15 @@ while running:
                     pass
             except Exception:
                 pass
-            ants.append(Ant())
+            new_ants.append(Ant())
             pts = 10
             score += pts
             # spawn a small popup showing points
-            popups.append(ScorePopup((ant.rect.centerx, ant.rect.top - 6), f"+{pts}", color=(255,220,100), life=50))
+            popups.append(acquire_popup((ant.rect.centerx, ant.rect.top - 6), f"+{pts}", color=(255,220,100), life=50))
+        if to_remove:
+            # drop captured ants in one pass rather than a list.remove() per ant
+            removed = set(to_remove)
+            ants[:] = [a for a in ants if a not in removed] + new_ants
 
     # If there are trapped ants, countdown capture timer and capture when timer expires (only when not in settings)
     if not show_settings and anteater.loop_active and anteater.trapped_ants:
@@ -767,12 +1220,8 @@ while running:
         else:
             # capture complete: remove trapped ants, respawn new ones, add score
             captured_count = len(anteater.trapped_ants)
-            for ant in anteater.trapped_ants:
-                try:
-                    ants.remove(ant)
-                except ValueError:
-                    pass
-                ants.append(Ant())
+            captured = set(anteater.trapped_ants)
+            ants[:] = [a for a in ants if a not in captured] + [Ant() for _ in anteater.trapped_ants]
             # award score (persist only on death)
             points = captured_count * 10
             score += points
@@ -786,14 +1235,14 @@ while running:
                     cx, cy = WIDTH//2, HEIGHT//2
             except Exception:
                 cx, cy = WIDTH//2, HEIGHT//2
-            popups.append(ScorePopup((cx, cy), f"+{points}", color=(255,180,120), life=80))
+            popups.append(acquire_popup((cx, cy), f"+{points}", color=(255,180,120), life=80))
             # small particle burst at centroid
             for i in range(min(20, MAX_PARTICLES - len(particles))):
                 ang = random.uniform(0, math.pi*2)
                 spd = random.uniform(1.0, 4.0)
                 vx = math.cos(ang) * spd
                 vy = math.sin(ang) * spd
-                particles.append(Particle((cx, cy), (vx, vy), (255, 200, 80), life=40))
+                particles.append(acquire_particle((cx, cy), (vx, vy), (255, 200, 80), life=40))
             # clear loop state
             anteater.loop_active = False
             anteater.loop_cells = set()
@@ -802,7 +1251,7 @@ while running:
     # Check for death only during normal play
     # update level based on elapsed time only when a player is logged in and game is active
     if not show_settings and game_start_ticks is not None and current_player_id is not None and not show_scores and not dead:
-        elapsed_seconds = (pygame.time.get_ticks() - game_start_ticks) // 1000
+        elapsed_seconds = (now_ticks - game_start_ticks) // 1000
         current_level = elapsed_seconds // 60 + 1
         # if level increased, ramp difficulty (spawn more ants up to max)
         if current_level > last_level:
@@ -816,138 +1265,93 @@ while running:
 
     if not show_settings and not dead:
         if check_player_death():
-            # persist final score with level if logged in
+            # persist final score with level if logged in; DB work runs on the
+            # worker thread so the frame isn't held up by the round-trips
             if current_player_id is not None:
-                try:
-                    add_score(current_player_id, score, current_level)
-                except Exception:
-                    pass
-            # fetch top scores for display
-            try:
-                top_scores = get_top_scores(10)
-            except Exception:
-                top_scores = []
+                db_executor.submit(save_score, current_player_id, score, current_level)
+            # fetch top scores for display (queued after the insert above, so
+            # the list includes the score just saved)
+            top_scores = []
+            top_scores_future = db_executor.submit(cached_top_scores, 10)
             show_scores = True
+            game_active = False
+
+    # pick up the top scores once the worker has fetched them
+    if top_scores_future is not None and top_scores_future.done():
+        try:
+            top_scores = top_scores_future.result()
+        except Exception:
+            top_scores = []
+        top_scores_future = None
 
     # --- Draw ---
     screen.fill(WHITE)
+    # screen areas drawn this frame, for the partial display update below
+    dirty_rects = []
     # Draw loop filled polygon (under ants and tongue)
-    if anteater.loop_active and anteater.loop_path:
-        poly_pts = anteater.get_loop_polygon_pixels()
-        if poly_pts:
-            # create transparent surface to draw filled polygon
-            surf = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
-            pygame.draw.polygon(surf, (255, 150, 150, 90), poly_pts)
-            # pulsing outline alpha
-            t = pygame.time.get_ticks()
-            pulse = 128 + int(127 * math.sin(t / 250.0))
-            outline_color = (255, 80, 80, pulse)
-            # draw outline slightly thicker by drawing multiple outlines
-            pygame.draw.polygon(surf, outline_color, poly_pts, 3)
-            screen.blit(surf, (0, 0))
-
-    # Draw ants: if trapped, draw at trapped_pos and don't update movement; fade based on timer
-    for ant in ants:
-        if getattr(ant, 'trapped', False) and getattr(ant, 'trapped_pos', None) is not None:
-            tx, ty = ant.trapped_pos
-            # fade alpha as timer goes down
-            alpha = 255
-            if anteater.capture_delay_frames > 0:
-                ratio = max(0.0, min(1.0, anteater.capture_timer / anteater.capture_delay_frames))
-                alpha = int(255 * ratio)
-            # draw trapped ant on an alpha surface
-            ant_surf = pygame.Surface((ant.rect.width, ant.rect.height), pygame.SRCALPHA)
-            ant_surf.fill((0, 0, 0, alpha))
-            screen.blit(ant_surf, (tx, ty))
-        else:
-            ant.draw(screen)
+    loop_area = anteater.draw_loop(screen, now_ticks)
+    if loop_area:
+        dirty_rects.append(loop_area)
+
+    # Draw ants: trapped ones (all listed in anteater.trapped_ants) go first, at
+    # trapped_pos and fading with the capture timer; free ants are drawn on top
+    if anteater.trapped_ants:
+        # fade alpha as timer goes down; every trapped ant shares it this frame
+        alpha = 255
+        if anteater.capture_delay_frames > 0:
+            ratio = max(0.0, min(1.0, anteater.capture_timer / anteater.capture_delay_frames))
+            alpha = int(255 * ratio)
+        TRAPPED_ANT.set_alpha(alpha)
+        blit_batch(screen, [(TRAPPED_ANT, ant.trapped_pos) for ant in anteater.trapped_ants
+                            if ant.trapped and ant.trapped_pos is not None], dirty_rects)
+    blit_batch(screen, [a.get_blit() for a in ants if not a.trapped], dirty_rects)
 
     # update and draw particles
-    for p in particles[:]:
-        p.update()
-        if p.life <= 0:
-            particles.remove(p)
-        else:
-            p.draw(screen)
+    # update() reports whether the particle is still alive; rebuild the list in
+    # one pass and hand expired ones back to the free list
+    alive = []
+    for p in particles:
+        (alive if p.update() else _particle_free).append(p)
+    particles[:] = alive
+    draw_particles(screen, particles, dirty_rects)
 
     # update and draw score popups
-    for popup in popups[:]:
-        popup.update()
-        if popup.life <= 0:
-            popups.remove(popup)
-        else:
-            popup.draw(screen)
+    alive = []
+    for popup in popups:
+        (alive if popup.update() else _popup_free).append(popup)
+    popups[:] = alive
+    blit_batch(screen, [b for b in (popup.get_blit() for popup in popups)
+                        if SCREEN_RECT.colliderect(b[0].get_rect(topleft=b[1]))], dirty_rects)
 
-    score_text = font.render(f"Score: {score}", True, BLACK)
-    screen.blit(score_text, (10, 10))
-    lvl_text = font.render(f"Level: {current_level}", True, BLACK)
-    screen.blit(lvl_text, (10, 40))
+    blit_batch(screen, [(T(f"Score: {score}"), (10, 10)), (T(f"Level: {current_level}"), (10, 40))],
+               dirty_rects)
 
     # Draw tongue on top of the filled polygon / ants
-    anteater.draw(screen)
+    dirty_rects.append(anteater.draw(screen))
     
     # Show settings hint when logged in and not in other menus
-    if current_player_id is not None and not show_scores and not show_settings and not show_admin:
-        hint_text = font.render('Press ESC for Settings', True, (100, 100, 100))
-        screen.blit(hint_text, (WIDTH - hint_text.get_width() - 10, 10))
+    if game_active:
+        hint_text = T('Press ESC for Settings', (100, 100, 100))
+        hud_batch = [(hint_text, (WIDTH - hint_text.get_width() - 10, 10))]
         
         # Show admin hint for admin users
         if is_current_user_admin:
-            admin_hint = font.render('Press F1 for Admin', True, (100, 100, 100))
-            screen.blit(admin_hint, (WIDTH - admin_hint.get_width() - 10, 35))
+            admin_hint = T('Press F1 for Admin', (100, 100, 100))
+            hud_batch.append((admin_hint, (WIDTH - admin_hint.get_width() - 10, 35)))
+        blit_batch(screen, hud_batch, dirty_rects)
+
+    # menu overlays cover the whole screen; note it before their buttons can
+    # change the flags below
+    overlay_shown = show_scores or current_player_id is None or show_settings or show_admin
 
     # If dead/show_scores, draw overlay with top scores and options
     if show_scores:
-        overlay = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
-        overlay.fill((0,0,0,200))
-        screen.blit(overlay, (0,0))
-        title = font.render('Game Over - High Scores', True, WHITE)
-        screen.blit(title, (WIDTH//2 - title.get_width()//2, 80))
-        # list top scores (row: username, score, level, date)
-        y = 140
-        idx = 1
-        for row in top_scores:
-            try:
-                uname = row[0]
-                sc = row[1]
-                lvl = row[2] if len(row) > 2 else '?'
-                dt = row[3] if len(row) > 3 else None
-            except Exception:
-                # fallback if shape unexpected
-                uname = str(row[0]) if len(row) > 0 else 'unknown'
-                sc = row[1] if len(row) > 1 else 0
-                lvl = row[2] if len(row) > 2 else '?'
-                dt = row[3] if len(row) > 3 else None
-
-            # format date if possible
-            date_str = ''
-            try:
-                if dt is None:
-                    date_str = ''
-                elif hasattr(dt, 'strftime'):
-                    date_str = dt.strftime('%Y-%m-%d %H:%M')
-                else:
-                    date_str = str(dt)
-            except Exception:
-                date_str = str(dt)
-
-            txt = font.render(f'{idx}. {uname} — {sc} (L{lvl}) {date_str}', True, WHITE)
-            screen.blit(txt, (WIDTH//2 - txt.get_width()//2, y))
-            y += 30
-            idx += 1
-
-        # restart and quit buttons
-        restart_btn = pygame.Rect(WIDTH//2 - 120, HEIGHT - 140, 100, 40)
-        quit_btn = pygame.Rect(WIDTH//2 + 20, HEIGHT - 140, 100, 40)
-        pygame.draw.rect(screen, (100,200,100), restart_btn)
-        pygame.draw.rect(screen, (200,100,100), quit_btn)
-        screen.blit(font.render('Restart', True, BLACK), (restart_btn.x+10, restart_btn.y+6))
-        screen.blit(font.render('Quit', True, BLACK), (quit_btn.x+30, quit_btn.y+6))
+        # the layer is only redrawn when a new top_scores list arrives
+        scores_overlay.render(screen, top_scores)
 
         # check for click
-        if pygame.mouse.get_pressed()[0]:
-            mx, my = pygame.mouse.get_pos()
-            if restart_btn.collidepoint((mx,my)):
+        for mx, my in clicks_this_frame:
+            if scores_overlay.restart_btn.collidepoint((mx,my)):
                 # reset game state
                 dead = False
                 show_scores = False
@@ -957,96 +1361,44 @@ while running:
                 anteater.reset_tongue()
                 # restart level timer only if logged in
                 if current_player_id is not None:
-                    game_start_ticks = pygame.time.get_ticks()
-            if quit_btn.collidepoint((mx,my)):
+                    game_start_ticks = now_ticks
+            if scores_overlay.quit_btn.collidepoint((mx,my)):
                 pygame.quit()
                 sys.exit()
 
     # If not logged in, draw login/signup UI overlay and skip game input
     if current_player_id is None:
-        # dim background
-        overlay = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
-        overlay.fill((0,0,0,120))
-        screen.blit(overlay, (0,0))
-        title = font.render('Login / Signup', True, WHITE)
-        screen.blit(title, (WIDTH//2 - title.get_width()//2, 120))
-        username_input.draw(screen)
-        password_input.draw(screen)
-        # draw buttons
-        login_btn = pygame.Rect(250, 320, 140, 40)
-        signup_btn = pygame.Rect(410, 320, 140, 40)
-        pygame.draw.rect(screen, (100,200,100), login_btn)
-        pygame.draw.rect(screen, (100,100,200), signup_btn)
-        screen.blit(font.render('Login', True, BLACK), (login_btn.x + 30, login_btn.y + 6))
-        screen.blit(font.render('Signup', True, BLACK), (signup_btn.x + 20, signup_btn.y + 6))
-        # message
-        if auth_message:
-            msg = font.render(auth_message, True, (255,220,220))
-            screen.blit(msg, (WIDTH//2 - msg.get_width()//2, 380))
+        # dim background, inputs, buttons and message
+        login_overlay.render(screen, auth_message)
 
         # handle mouse clicks for buttons
-        if pygame.mouse.get_pressed()[0]:
-            mx, my = pygame.mouse.get_pos()
-            if login_btn.collidepoint((mx,my)):
+        for mx, my in clicks_this_frame:
+            if login_overlay.login_btn.collidepoint((mx,my)):
                 try:
                     pid = login(username_input.text, password_input.text)
                     current_player_id = pid
                     is_current_user_admin = is_admin(pid)
-                    game_start_ticks = pygame.time.get_ticks()
+                    game_start_ticks = now_ticks
                     auth_message = 'Logged in'
                 except Exception as e:
                     auth_message = f'Login failed: {e}'
-            if signup_btn.collidepoint((mx,my)):
+            if login_overlay.signup_btn.collidepoint((mx,my)):
                 try:
                     pid = signup(username_input.text, password_input.text)
                     current_player_id = pid
                     is_current_user_admin = is_admin(pid)
-                    game_start_ticks = pygame.time.get_ticks()
+                    game_start_ticks = now_ticks
                     auth_message = 'Account created & logged in'
                 except Exception as e:
                     auth_message = f'Signup failed: {e}'
 
     # Settings menu overlay (only when logged in)
     if show_settings and current_player_id is not None:
-        overlay = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
-        overlay.fill((0,0,0,180))
-        screen.blit(overlay, (0,0))
-        
-        title = font.render('Settings', True, WHITE)
-        screen.blit(title, (WIDTH//2 - title.get_width()//2, 100))
-        
-        # Username and password inputs with better spacing
-        username_label = font.render('New Username:', True, WHITE)
-        screen.blit(username_label, (200, 160))
-        settings_username_input.rect = pygame.Rect(200, 190, 400, 40)
-        settings_username_input.draw(screen)
-        
-        password_label = font.render('New Password:', True, WHITE)
-        screen.blit(password_label, (200, 250))
-        settings_password_input.rect = pygame.Rect(200, 280, 400, 40)
-        settings_password_input.draw(screen)
-        
-        # Buttons with better spacing
-        update_btn = pygame.Rect(200, 350, 140, 40)
-        cancel_btn = pygame.Rect(360, 350, 140, 40)
-        pygame.draw.rect(screen, (100,200,100), update_btn)
-        pygame.draw.rect(screen, (200,100,100), cancel_btn)
-        screen.blit(font.render('Update', True, BLACK), (update_btn.x + 30, update_btn.y + 6))
-        screen.blit(font.render('Cancel', True, BLACK), (cancel_btn.x + 30, cancel_btn.y + 6))
-        
-        # Instructions
-        instr1 = font.render('Press ESC to close settings', True, (200,200,200))
-        screen.blit(instr1, (WIDTH//2 - instr1.get_width()//2, 420))
-        
-        # Message
-        if settings_message:
-            msg = font.render(settings_message, True, (255,220,220))
-            screen.blit(msg, (WIDTH//2 - msg.get_width()//2, 450))
-        
+        settings_overlay.render(screen, settings_message)
+
         # Handle button clicks
-        if pygame.mouse.get_pressed()[0]:
-            mx, my = pygame.mouse.get_pos()
-            if update_btn.collidepoint((mx,my)):
+        for mx, my in clicks_this_frame:
+            if settings_overlay.update_btn.collidepoint((mx,my)):
                 new_username = settings_username_input.text.strip()
                 new_password = settings_password_input.text.strip()
                 
@@ -1064,45 +1416,17 @@ while running:
                 else:
                     settings_message = 'Please enter both username and password'
             
-            if cancel_btn.collidepoint((mx,my)):
+            if settings_overlay.cancel_btn.collidepoint((mx,my)):
                 show_settings = False
                 settings_message = ''
 
     # Admin menu overlay (only for admins)
     if show_admin and current_player_id is not None and is_current_user_admin:
-        overlay = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
-        overlay.fill((0,0,0,180))
-        screen.blit(overlay, (0,0))
-        
-        title = font.render('Admin Panel', True, WHITE)
-        screen.blit(title, (WIDTH//2 - title.get_width()//2, 100))
-        
-        # Target username input
-        target_label = font.render('Username to remove scores:', True, WHITE)
-        screen.blit(target_label, (200, 250))
-        admin_target_input.draw(screen)
-        
-        # Buttons
-        delete_btn = pygame.Rect(200, 350, 180, 40)
-        cancel_btn = pygame.Rect(400, 350, 140, 40)
-        pygame.draw.rect(screen, (200,50,50), delete_btn)
-        pygame.draw.rect(screen, (100,100,100), cancel_btn)
-        screen.blit(font.render('Delete Scores', True, WHITE), (delete_btn.x + 20, delete_btn.y + 6))
-        screen.blit(font.render('Cancel', True, WHITE), (cancel_btn.x + 30, cancel_btn.y + 6))
-        
-        # Instructions
-        instr1 = font.render('Press F1 to close admin panel', True, (200,200,200))
-        screen.blit(instr1, (WIDTH//2 - instr1.get_width()//2, 420))
-        
-        # Message
-        if admin_message:
-            msg = font.render(admin_message, True, (255,220,220))
-            screen.blit(msg, (WIDTH//2 - msg.get_width()//2, 450))
-        
+        admin_overlay.render(screen, admin_message)
+
         # Handle button clicks
-        if pygame.mouse.get_pressed()[0]:
-            mx, my = pygame.mouse.get_pos()
-            if delete_btn.collidepoint((mx,my)):
+        for mx, my in clicks_this_frame:
+            if admin_overlay.delete_btn.collidepoint((mx,my)):
                 target_user = admin_target_input.text.strip()
                 if target_user:
                     try:
@@ -1114,17 +1438,30 @@ while running:
                 else:
                     admin_message = 'Please enter a username'
             
-            if cancel_btn.collidepoint((mx,my)):
+            if admin_overlay.cancel_btn.collidepoint((mx,my)):
                 show_admin = False
                 admin_message = ''
 
     # show capture countdown when loop is active and trapped ants exist
     if anteater.loop_active and anteater.trapped_ants:
-        secs = anteater.capture_timer / FPS
-        cnt_text = font.render(f"Capturing in: {secs:.1f}s", True, (150, 0, 0))
-        screen.blit(cnt_text, (10, 50))
-
-    pygame.display.flip()
+        # whole tenths only, so the countdown is a handful of cached T() labels
+        secs = round(anteater.capture_timer / FPS, 1)
+        cnt_text = T(f"Capturing in: {secs:.1f}s", (150, 0, 0))
+        dirty_rects.append(screen.blit(cnt_text, (10, 50)))
+
+    # Push only what changed since the last frame (this frame's and last
+    # frame's drawn areas) when that is a few small rects; a menu overlay
+    # covers the whole screen, so it and the frame after it use flip().
+    if overlay_shown or prev_dirty_rects is None:
+        pygame.display.flip()
+    else:
+        update_rects = prev_dirty_rects + dirty_rects
+        if (len(update_rects) < DIRTY_RECTS_MAX
+                and sum(r.w * r.h for r in update_rects) < WIDTH * HEIGHT // 3):
+            pygame.display.update(update_rects)
+        else:
+            pygame.display.flip()
+    prev_dirty_rects = None if overlay_shown else dirty_rects
 
 pygame.quit()
 sys.exit()
@@ -7,7 +7,10 @@ CREATE TABLE IF NOT EXISTS players (
   player_id INT AUTO_INCREMENT PRIMARY KEY,
   username VARCHAR(64) NOT NULL UNIQUE,
   password_hash VARBINARY(128) NOT NULL,
-  date_created DATETIME NOT NULL
+  date_created DATETIME NOT NULL,
+  is_admin BOOLEAN DEFAULT FALSE,
+  INDEX idx_players_login (username, password_hash, player_id, is_admin),
+  INDEX idx_players_admin (player_id, is_admin)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
 
 CREATE TABLE IF NOT EXISTS scores (
@@ -15,6 +18,7 @@ CREATE TABLE IF NOT EXISTS scores (
   player_id INT NOT NULL,
   score INT NOT NULL,
   date DATETIME NOT NULL,
+  INDEX idx_scores_score_desc (score DESC),
   FOREIGN KEY (player_id) REFERENCES players(player_id) ON DELETE CASCADE
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
 